@@ -1,13 +1,23 @@
 """移动充电调度的云边协同强化学习脚手架。"""
 
+import importlib
+
 __all__ = [
     "config",
     "geo",
     "data",
     "ev",
     "edge_env",
+    "vec_env",
     "cloud_env",
     "agents",
     "trainer",
     "simulation_runner",
 ]
+
+
+def __getattr__(name: str):
+    # 子模块在首次访问时才导入，保持 `import rl_mcs` 的启动开销最小
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,48 @@
+"""Numba编译的地理计算内核；未安装numba时退化为同名纯Python实现。"""
+from __future__ import annotations
+
+import math
+
+from .geo import EARTH_RADIUS_KM
+
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:  # numba为可选依赖，缺失时内核按纯Python执行
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def haversine_km_scalar(lon1, lat1, lon2, lat2):
+    """计算两点间的大圆距离（公里），参数为角度。"""
+
+    lon1 = math.radians(lon1)
+    lat1 = math.radians(lat1)
+    lon2 = math.radians(lon2)
+    lat2 = math.radians(lat2)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+@njit(cache=True, fastmath=True)
+def haversine_km_batch(lon_rad, lat_rad, lons_rad, lats_rad, cos_lats, out):
+    """计算单个查询点到一组点的大圆距离并写入out，参数均为弧度，cos_lats为各点预计算的cos(lat)。
+
+    候选点通常只有几个到几百个，串行循环即可，线程池的启动开销反而更大。
+    """
+
+    cos_lat = math.cos(lat_rad)
+    for i in range(lons_rad.shape[0]):
+        dlat = lats_rad[i] - lat_rad
+        dlon = lons_rad[i] - lon_rad
+        a = math.sin(dlat / 2) ** 2 + cos_lat * cos_lats[i] * math.sin(dlon / 2) ** 2
+        # fastmath下舍入可能使a略大于1，截断后再求asin
+        out[i] = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+    return out
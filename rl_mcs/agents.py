@@ -5,7 +5,9 @@ import random
 from dataclasses import dataclass
 from typing import Dict, List, Sequence
 
-from .cloud_env import CloudObservation
+import numpy as np
+
+from .cloud_env import AVERAGE_WAIT_COL, CloudObservation
 from .config import CloudConfig, EdgeConfig
 from .edge_env import EdgeObservation
 
@@ -17,14 +19,14 @@ class EdgePolicy:
     def act(self, obs: EdgeObservation) -> List[int]:
         """为每个排队请求选择调度点索引，当前直接选最近候选。"""
 
-        actions: List[int] = []
-        num_requests = obs.pending_requests
-        for _ in range(num_requests):
-            if not obs.candidate_points:
-                actions.append(None)  # type: ignore  # 无可选调度点时输出空动作
-                continue
-            actions.append(0)
-        return actions
+        if len(obs.candidate_points) == 0:
+            return [None] * obs.pending_requests  # type: ignore  # 无可选调度点时输出空动作
+        return [0] * obs.pending_requests
+
+    def act_batch(self, obs_list: Sequence[EdgeObservation]) -> List[List[int]]:
+        """对多个区域的观测一次性给出动作；替换为神经网络时在此堆叠特征做单次前向。"""
+
+        return [self.act(obs) for obs in obs_list]
 
     def update(self, batch) -> Dict[str, float]:  # 占位接口
         return {"loss": 0.0}
@@ -37,16 +39,19 @@ class CloudPolicy:
     def act(self, obs: CloudObservation) -> Dict[str, int]:
         """将更多MCS分配给平均等待时间较高的区域。"""
 
-        if not obs.summaries:
+        region_ids = obs.region_ids
+        if not region_ids:
             return {}
-        sorted_regions = sorted(obs.summaries, key=lambda s: s.average_wait, reverse=True)
-        action: Dict[str, int] = {}
-        for idx, summary in enumerate(sorted_regions):
-            if idx == 0:
-                action[summary.region_id] = min(self.config.max_transfer_per_interval, 1)
-            elif idx == len(sorted_regions) - 1:
-                action[summary.region_id] = -1
-        return action
+        if len(region_ids) == 1:
+            return {region_ids[0]: min(self.config.max_transfer_per_interval, 1)}
+        # 直接在批量摘要数组上取最大/最小等待区域；最小值取最后一个以保持原稳定排序的语义
+        waits = obs.features[:, AVERAGE_WAIT_COL]
+        hi = int(np.argmax(waits))
+        lo = len(waits) - 1 - int(np.argmin(waits[::-1]))
+        return {
+            region_ids[hi]: min(self.config.max_transfer_per_interval, 1),
+            region_ids[lo]: -1,
+        }
 
     def update(self, batch) -> Dict[str, float]:
         return {"loss": 0.0}
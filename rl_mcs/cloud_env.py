@@ -2,14 +2,45 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from operator import attrgetter
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from .config import CloudConfig, RegionSummary
 
+# 区域摘要数组的列顺序
+SUMMARY_FIELDS: Tuple[str, ...] = ("success_rate", "average_wait", "arrival_rate", "available_mcs", "queue_length")
+SUCCESS_RATE_COL = SUMMARY_FIELDS.index("success_rate")
+AVERAGE_WAIT_COL = SUMMARY_FIELDS.index("average_wait")
+
+
+def write_summary_row(summary: RegionSummary, out_row: np.ndarray) -> None:
+    """按SUMMARY_FIELDS的列顺序将单个区域摘要写入 ``out_row``。"""
+
+    out_row[:] = [getattr(summary, name) for name in SUMMARY_FIELDS]
+
+
+def stack_summaries(summaries: Sequence[RegionSummary]) -> np.ndarray:
+    """将区域摘要堆叠为(R, len(SUMMARY_FIELDS))的float64数组。"""
+
+    out = np.empty((len(summaries), len(SUMMARY_FIELDS)), dtype=np.float64)
+    for row, summary in zip(out, summaries):
+        write_summary_row(summary, row)
+    return out
+
 
 @dataclass
 class CloudObservation:
-    summaries: List[RegionSummary]
+    summaries: Optional[List[RegionSummary]] = None
+    features: Optional[np.ndarray] = None  # (R, len(SUMMARY_FIELDS))，行与region_ids对齐
+    region_ids: Optional[List[str]] = None
+
+    def __post_init__(self) -> None:
+        if self.features is None:
+            self.features = stack_summaries(self.summaries or [])
+        if self.region_ids is None:
+            self.region_ids = [s.region_id for s in self.summaries or []]
 
 
 class CloudEnv:
@@ -17,45 +48,78 @@ class CloudEnv:
 
     def __init__(self, config: CloudConfig, region_ids: List[str]):
         self.config = config
-        self.region_ids = region_ids
-        self.allocations: Dict[str, int] = {rid: 1 for rid in region_ids}
+        self.region_ids = list(region_ids)
+        self._rid_to_idx: Dict[str, int] = {rid: idx for idx, rid in enumerate(self.region_ids)}
+        self.alloc = np.ones(len(self.region_ids), dtype=np.int32)
         self.time_step = 0
 
-    def observe(self, summaries: List[RegionSummary]) -> CloudObservation:
+    @property
+    def allocations(self) -> Dict[str, int]:
+        """按区域ID给出的配额视图。"""
+
+        return dict(zip(self.region_ids, self.alloc.tolist()))
+
+    def _region_index(self, region_id: str) -> int:
+        idx = self._rid_to_idx.get(region_id)
+        if idx is None:
+            # 未登记的区域按配额0加入
+            idx = len(self.region_ids)
+            self.region_ids.append(region_id)
+            self._rid_to_idx[region_id] = idx
+            self.alloc = np.append(self.alloc, np.int32(0))
+        return idx
+
+    def observe(
+        self, summaries: Union[List[RegionSummary], np.ndarray], region_ids: Optional[List[str]] = None
+    ) -> CloudObservation:
+        """构造云端观测。
+
+        ``summaries`` 可为RegionSummary列表，或按SUMMARY_FIELDS列排列的摘要数组（需同时给出行对应的
+        ``region_ids``）；数组会被拷贝，调用方可复用自己的缓冲区。
+        """
+
+        if isinstance(summaries, np.ndarray):
+            if region_ids is None:
+                raise ValueError("region_ids is required when summaries is an array")
+            return CloudObservation(features=np.array(summaries, dtype=np.float64), region_ids=list(region_ids))
         return CloudObservation(summaries=summaries)
 
-    def step(self, action: Dict[str, int], summaries: List[RegionSummary]) -> Tuple[CloudObservation, float, bool, Dict]:
-        """根据区域统计调整配额，并计算对应奖励。"""
+    def step(
+        self,
+        action: Dict[str, int],
+        summaries: Union[CloudObservation, List[RegionSummary], np.ndarray],
+        region_ids: Optional[List[str]] = None,
+    ) -> Tuple[CloudObservation, float, bool, Dict]:
+        """根据区域统计调整配额，并计算对应奖励。
+
+        ``summaries`` 可直接传入本步 :meth:`observe` 得到的CloudObservation以免再次拷贝，其余形式同
+        :meth:`observe`；``info["wait"]`` 为与其行顺序一致的平均等待数组。
+        """
 
-        reward = 0.0
-        info: Dict[str, float] = {}
-        for rid, delta in action.items():
-            new_alloc = max(0, self.allocations.get(rid, 0) + delta)
-            transfer_cost = abs(delta) * 0.1
-            reward -= transfer_cost
-            self.allocations[rid] = new_alloc
+        obs = summaries if isinstance(summaries, CloudObservation) else self.observe(summaries, region_ids)
+        indices = [self._region_index(rid) for rid in action]
+        delta_vec = np.zeros_like(self.alloc)
+        delta_vec[indices] = list(action.values())
+        np.maximum(self.alloc + delta_vec, 0, out=self.alloc)
 
-        # 对成功率高、等待低的区域给予更高奖励
-        for summary in summaries:
-            reward += summary.success_rate * 2.0
-            reward -= summary.average_wait * 0.05
-            info[f"wait_{summary.region_id}"] = summary.average_wait
+        # 对成功率高、等待低的区域给予更高奖励，并扣除调拨成本
+        success = obs.features[:, SUCCESS_RATE_COL]
+        avg_wait = obs.features[:, AVERAGE_WAIT_COL]
+        reward = 2.0 * success.sum() - 0.05 * avg_wait.sum() - 0.1 * np.abs(delta_vec).sum()
 
         self.time_step += 1
-        obs = self.observe(summaries)
         done = False
-        return obs, reward, done, info
+        return obs, float(reward), done, {"wait": avg_wait}
 
     def greedy_action(self, summaries: List[RegionSummary]) -> Dict[str, int]:
         """简单基线：将资源从低等待区域迁移至高等待区域。"""
 
         if not summaries:
             return {}
-        sorted_regions = sorted(summaries, key=lambda s: s.average_wait, reverse=True)
-        action: Dict[str, int] = {}
-        for idx, summary in enumerate(sorted_regions):
-            if idx == 0:
-                action[summary.region_id] = min(self.config.max_transfer_per_interval, 1)
-            elif idx == len(sorted_regions) - 1:
-                action[summary.region_id] = -1
+        key = attrgetter("average_wait")
+        hi = max(summaries, key=key)
+        lo = min(reversed(summaries), key=key)  # 并列时取最后一个，与原稳定排序一致
+        action: Dict[str, int] = {hi.region_id: min(self.config.max_transfer_per_interval, 1)}
+        if lo is not hi:
+            action[lo.region_id] = -1
         return action
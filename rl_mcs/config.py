@@ -24,6 +24,10 @@ class EdgeConfig:
     max_queue_size: int = 50
     dispatch_points_path: Path = Path("dataset/dispatch_points_400.csv")
     fcs_regions_path: Path = Path("dataset/fcs_voronoi_regions.geojson")
+    mcs_battery_kwh: float = 100.0
+    mcs_energy_per_service_kwh: float = 5.0
+    mcs_min_battery_kwh: float = 10.0  # 低于该电量的MCS不再接单
+    mcs_service_steps: int = 3  # 单次服务占用的时间步数
     replay_buffer_size: int = 50000
     batch_size: int = 128
     gamma: float = 0.99
@@ -54,6 +58,8 @@ class SimulationConfig:
     log_dir: Path = Path("logs")
     random_seed: int = 42
     max_steps: Optional[int] = None
+    share_edge_policy: bool = False  # 为True时各区域共享同一EdgePolicy（参数共享）
+    edge_rollout_workers: int = 1  # 大于1时用线程池并行推进各区域环境
     edge: EdgeConfig = field(default_factory=EdgeConfig)
     cloud: CloudConfig = field(default_factory=CloudConfig)
     ev: EVConfig = field(default_factory=EVConfig)
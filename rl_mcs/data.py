@@ -2,16 +2,22 @@
 from __future__ import annotations
 
 import csv
+import os
+import sys
+import warnings
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Sequence
+from typing import Deque, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-import pandas as pd
+import numpy as np
 
-from .geo import haversine_km
+from .geo import haversine_km_np
 
 
-@dataclass
+@dataclass(slots=True)
 class TrajectoryPoint:
     timestamp: str
     lon: float
@@ -20,51 +26,162 @@ class TrajectoryPoint:
 
 @dataclass
 class Trajectory:
-    vehicle_id: str
-    points: List[TrajectoryPoint]
-
+    """单车轨迹的列式（SoA）存储，逐点对象仅在需要时构造。"""
 
-def load_dispatch_points(path: Path) -> List[Dict[str, float]]:
-    """从CSV文件读取调度点与固定充电桩坐标。"""
+    vehicle_id: str
+    timestamps: np.ndarray
+    lon: np.ndarray
+    lat: np.ndarray
+
+    @classmethod
+    def from_points(cls, vehicle_id: str, points: Sequence[TrajectoryPoint]) -> "Trajectory":
+        return cls(
+            vehicle_id=vehicle_id,
+            timestamps=np.array([p.timestamp for p in points], dtype=object),
+            lon=np.fromiter((p.lon for p in points), dtype=np.float64, count=len(points)),
+            lat=np.fromiter((p.lat for p in points), dtype=np.float64, count=len(points)),
+        )
+
+    def __len__(self) -> int:
+        return int(self.lon.size)
+
+    @property
+    def points(self) -> List[TrajectoryPoint]:
+        """按需构造TrajectoryPoint列表，兼容旧的逐点接口。"""
 
-    with path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
         return [
-            {
-                "lon": float(row.get("lon") or row.get("longitude")),
-                "lat": float(row.get("lat") or row.get("latitude")),
-                "region": row.get("region", ""),
-            }
-            for row in reader
+            TrajectoryPoint(timestamp=ts, lon=lon, lat=lat)
+            for ts, lon, lat in zip(self.timestamps.tolist(), self.lon.tolist(), self.lat.tolist())
         ]
 
 
-def load_vehicle_trajectories(root: Path, region_ids: Iterable[str] | None = None) -> List[Trajectory]:
-    """从指定目录读取车辆轨迹CSV文件。"""
+def coord_arrays(points: Union[Trajectory, Sequence[TrajectoryPoint]]) -> Tuple[np.ndarray, np.ndarray]:
+    """返回轨迹的经度、纬度数组，Trajectory直接返回其列数据。"""
 
-    trajectories: List[Trajectory] = []
-    files = sorted(root.glob("*.csv"))
-    selected_regions = set(region_ids) if region_ids else None
-    for file in files:
-        df = pd.read_csv(file)
-        if selected_regions is not None and "region" in df.columns:
-            df = df[df["region"].isin(selected_regions)]
-        points = [
-            TrajectoryPoint(timestamp=str(row["timestamp"]), lon=float(row["lon"]), lat=float(row["lat"]))
-            for _, row in df.iterrows()
-        ]
-        trajectories.append(Trajectory(vehicle_id=file.stem, points=points))
-    return trajectories
+    if isinstance(points, Trajectory):
+        return points.lon, points.lat
+    lon = np.fromiter((p.lon for p in points), dtype=np.float64, count=len(points))
+    lat = np.fromiter((p.lat for p in points), dtype=np.float64, count=len(points))
+    return lon, lat
+
+
+_TRAJECTORY_COLUMNS = frozenset({"timestamp", "lon", "lat", "longitude", "latitude", "region"})
+
+
+def load_dispatch_points(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """从CSV文件读取调度点与固定充电桩坐标。
 
+    安装pyarrow时按列类型直接解析为数组，否则退回逐行的csv解析。
 
-def estimate_energy_kwh(points: Sequence[TrajectoryPoint], energy_per_km: float) -> float:
+    Returns:
+        只读的(P, 2)经纬度数组，以及对应的区域名数组（缺失时为空字符串）。
+    """
+
+    try:
+        xy, regions = _read_dispatch_points_arrow(path)
+    except ImportError:  # pyarrow为可选依赖
+        xy, regions = _read_dispatch_points_csv(path)
+    xy.flags.writeable = False
+    return xy, regions
+
+
+def _read_dispatch_points_arrow(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    column_types = {name: pa.float64() for name in ("lon", "lat", "longitude", "latitude")}
+    column_types["region"] = pa.string()
+    table = pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(column_types=column_types))
+    names = table.column_names
+    lon = table["lon" if "lon" in names else "longitude"].to_numpy()
+    lat = table["lat" if "lat" in names else "latitude"].to_numpy()
+    xy = np.column_stack([lon, lat]).astype(np.float64, copy=False)
+    if "region" in names:
+        regions = table["region"].to_numpy(zero_copy_only=False).astype(object)
+    else:
+        regions = np.full(table.num_rows, "", dtype=object)
+    return xy, regions
+
+
+def _read_dispatch_points_csv(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    with path.open("r", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    xy = np.array(
+        [(float(row.get("lon") or row.get("longitude")), float(row.get("lat") or row.get("latitude"))) for row in rows],
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    regions = np.array([row.get("region", "") for row in rows], dtype=object)
+    return xy, regions
+
+
+def _load_one(path: Path, selected_regions: FrozenSet[str] | None = None) -> Trajectory:
+    """读取单个轨迹CSV文件，供进程池并行调用。"""
+
+    import pandas as pd  # 仅轨迹加载需要pandas，延迟导入以降低包的导入开销
+
+    # 只读取所需列并直接转为NumPy数组，避免逐行构造对象
+    df = pd.read_csv(path, usecols=lambda col: col in _TRAJECTORY_COLUMNS)
+    # 同一文件中时间戳大量重复，去重后驻留字符串，各行共享同一对象
+    codes, uniques = pd.factorize(df["timestamp"].astype(str))
+    timestamps = np.array([sys.intern(ts) for ts in uniques], dtype=object)[codes]
+    lon = df["lon" if "lon" in df.columns else "longitude"].to_numpy(dtype=np.float64)
+    lat = df["lat" if "lat" in df.columns else "latitude"].to_numpy(dtype=np.float64)
+    if selected_regions is not None and "region" in df.columns:
+        mask = df["region"].isin(selected_regions).to_numpy()
+        timestamps, lon, lat = timestamps[mask], lon[mask], lat[mask]
+    return Trajectory(vehicle_id=path.stem, timestamps=timestamps, lon=lon, lat=lat)
+
+
+def iter_vehicle_trajectories(
+    root: Path,
+    region_ids: Iterable[str] | None = None,
+    max_workers: Optional[int] = None,
+) -> Iterator[Trajectory]:
+    """逐文件读取车辆轨迹并按文件顺序产出，内存中只保留少量在途文件。
+
+    各文件相互独立，使用进程池并行解析，同时在途任务数限制为 ``2 * max_workers``。
+    """
+
+    files = sorted(root.glob("*.csv"))
+    load = partial(_load_one, selected_regions=frozenset(region_ids) if region_ids else None)
+    workers = min(max_workers or os.cpu_count() or 1, len(files))
+    if workers <= 1:
+        for file in files:
+            yield load(file)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending: Deque[Future] = deque()
+        for file in files:
+            pending.append(ex.submit(load, file))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_vehicle_trajectories(
+    root: Path,
+    region_ids: Iterable[str] | None = None,
+    max_workers: Optional[int] = None,
+) -> List[Trajectory]:
+    """一次性读取全部轨迹，已弃用，请改用iter_vehicle_trajectories。"""
+
+    warnings.warn(
+        "load_vehicle_trajectories is deprecated; use iter_vehicle_trajectories instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return list(iter_vehicle_trajectories(root, region_ids, max_workers))
+
+
+def estimate_energy_kwh(points: Union[Trajectory, Sequence[TrajectoryPoint]], energy_per_km: float) -> float:
     """估算经过给定轨迹段需要的能耗。"""
 
-    total = 0.0
-    for idx in range(1, len(points)):
-        p1, p2 = points[idx - 1], points[idx]
-        total += haversine_km(p1.lon, p1.lat, p2.lon, p2.lat) * energy_per_km
-    return total
+    lon, lat = coord_arrays(points)
+    if lon.size < 2:
+        return 0.0
+    dist = haversine_km_np(lon[:-1], lat[:-1], lon[1:], lat[1:])
+    return float((dist * energy_per_km).sum())
 
 
 def iterate_trips(points: Sequence[TrajectoryPoint]) -> Iterator[tuple[TrajectoryPoint, TrajectoryPoint]]:
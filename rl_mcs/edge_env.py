@@ -3,26 +3,30 @@ from __future__ import annotations
 
 import random
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from .config import EdgeConfig, RegionSummary
+import numpy as np
+
+from .cloud_env import SUMMARY_FIELDS
+from .config import CloudConfig, EdgeConfig, RegionSummary
 from .ev import ChargeRequest
-from .geo import nearest_points_within
+from .geo import PointSet
 
 
-@dataclass
+@dataclass(slots=True)
 class QueueItem:
     request: ChargeRequest
     wait_time: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class MCSState:
-    """移动充电车的静态状态，不考虑电量消耗。"""
+    """移动充电车的位置、电量与可用状态。"""
 
     lon: float
     lat: float
     available: bool = True
+    battery_kwh: float = 0.0
 
 
 @dataclass
@@ -34,43 +38,112 @@ class EdgeObservation:
     available_mcs: int
     time_bin: int
     arrival_rate: float
-    candidate_points: List[Tuple[float, float]]
+    candidate_points: np.ndarray  # (P, 2) 经纬度，与EdgeEnv共享同一数组
 
 
 class EdgeEnv:
-    """单区域的排队与调度简化环境。"""
+    """单区域的排队与调度简化环境。
+
+    排队请求与MCS状态均以列式NumPy数组保存，队列占用前 ``_n`` 个槽位。
+    """
 
-    def __init__(self, region_id: str, config: EdgeConfig, dispatch_points: List[Tuple[float, float]]):
+    ARRIVAL_RATE_EPS = 1e-6  # 到达率衰减到该值以下时置0，使空闲区域的摘要版本不再变化
+
+    def __init__(
+        self,
+        region_id: str,
+        config: EdgeConfig,
+        dispatch_points: Union[PointSet, np.ndarray],
+        allocation_interval: int = CloudConfig.allocation_interval,
+    ):
         self.region_id = region_id
         self.config = config
-        self.dispatch_points = dispatch_points
-        self.queue: List[QueueItem] = []
+        # 调度点按引用保存，不做拷贝，多个区域环境可共享同一份数据及其预计算的弧度/cos(lat)
+        if not isinstance(dispatch_points, PointSet):
+            dispatch_points = PointSet.from_points(dispatch_points)
+        self.dispatch_set = dispatch_points
+        self.dispatch_points_xy = dispatch_points.xy
         self.time_step = 0
         self.arrivals_last_window = 0
-        self.mcs_pool: List[MCSState] = [MCSState(lon=lon, lat=lat) for lon, lat in dispatch_points]
+        # 到达率以云端分配周期为时间窗做指数滑动平均
+        self._arrival_alpha = 1.0 / max(1, allocation_interval)
+        self._arrival_ewma = 0.0
+        self._arrived_this_step = False
+
+        capacity = config.max_queue_size
+        self._n = 0
+        self._wait = np.zeros(capacity, dtype=np.int32)
+        self._req_lon = np.zeros(capacity, dtype=np.float64)
+        self._req_lat = np.zeros(capacity, dtype=np.float64)
+        self._requests = np.empty(capacity, dtype=object)
+
+        self.mcs_lon = self.dispatch_points_xy[:, 0].copy()
+        self.mcs_lat = self.dispatch_points_xy[:, 1].copy()
+        self.mcs_avail = np.ones(len(self.dispatch_points_xy), dtype=np.bool_)
+        self.mcs_battery = np.full(len(self.dispatch_points_xy), config.mcs_battery_kwh, dtype=np.float64)
+        self.mcs_busy_until = np.zeros(len(self.dispatch_points_xy), dtype=np.int64)
+
+        # observe()读取的增量统计量，随add_request/step/_assign_mcs同步更新
+        self._wait_sum = 0
+        self._wait_max = 0
+        self._avail_count = len(self.dispatch_points_xy)
+
+        # 摘要缓存：影响摘要的状态变化时递增版本号，版本未变则直接复用上次的RegionSummary
+        self._summary_version = 0
+        self._summary_cache: Optional[RegionSummary] = None
+        self._summary_cache_version = -1
+        self._summary_row = np.zeros(len(SUMMARY_FIELDS), dtype=np.float64)
+        self._summary_row_version = -1
+
+    @property
+    def dispatch_points(self) -> np.ndarray:
+        return self.dispatch_points_xy
+
+    @property
+    def queue(self) -> List[QueueItem]:
+        """按需构造的排队快照，兼容旧的逐项接口。"""
+
+        return [
+            QueueItem(request=req, wait_time=int(wait))
+            for req, wait in zip(self._requests[: self._n], self._wait[: self._n])
+        ]
+
+    @property
+    def mcs_pool(self) -> List[MCSState]:
+        """按需构造的MCS状态快照。"""
+
+        return [
+            MCSState(lon=float(lon), lat=float(lat), available=bool(avail), battery_kwh=float(battery))
+            for lon, lat, avail, battery in zip(self.mcs_lon, self.mcs_lat, self.mcs_avail, self.mcs_battery)
+        ]
 
     def observe(self) -> EdgeObservation:
-        waits = [item.wait_time for item in self.queue] or [0]
-        mean_wait = sum(waits) / len(waits)
-        max_wait = max(waits)
+        mean_wait = self._wait_sum / self._n if self._n else 0.0
         time_bin = (self.time_step // 12) % 24  # 以5分钟步长统计为2小时区间
-        arrival_rate = self.arrivals_last_window / max(1, self.time_step)
         return EdgeObservation(
             region_id=self.region_id,
-            pending_requests=len(self.queue),
+            pending_requests=self._n,
             mean_wait=mean_wait,
-            max_wait=max_wait,
-            available_mcs=sum(1 for m in self.mcs_pool if m.available),
+            max_wait=float(self._wait_max),
+            available_mcs=self._avail_count,
             time_bin=time_bin,
-            arrival_rate=arrival_rate,
-            candidate_points=self.dispatch_points,
+            arrival_rate=self._arrival_ewma,
+            candidate_points=self.dispatch_points_xy,
         )
 
     def add_request(self, request: ChargeRequest) -> None:
-        if len(self.queue) >= self.config.max_queue_size:
+        if self._n >= self.config.max_queue_size:
             return
-        self.queue.append(QueueItem(request=request))
+        slot = self._n
+        self._wait[slot] = 0
+        self._req_lon[slot] = request.lon
+        self._req_lat[slot] = request.lat
+        self._requests[slot] = request
+        self._n += 1
         self.arrivals_last_window += 1
+        self._arrival_ewma = (1.0 - self._arrival_alpha) * self._arrival_ewma + self._arrival_alpha
+        self._arrived_this_step = True
+        self._summary_version += 1
 
     def step(self, action_indices: Optional[List[int]]) -> Tuple[EdgeObservation, float, bool, Dict]:
         """将待处理请求分配到调度点并推进时间步。
@@ -81,59 +154,120 @@ class EdgeEnv:
 
         reward = 0.0
         info: Dict[str, float] = {}
+        n = self._n
+
+        # 服务结束且电量充足的MCS恢复可用
+        ready = (self.mcs_battery > self.config.mcs_min_battery_kwh) & (self.mcs_busy_until <= self.time_step)
+        newly_ready = int(np.count_nonzero(ready & ~self.mcs_avail))
+        self._avail_count += newly_ready
+        self.mcs_avail |= ready
+        # 空闲区域（无排队、到达率已衰减为0、无MCS状态变化）的摘要保持不变
+        if n or newly_ready or self._arrival_ewma:
+            self._summary_version += 1
 
         # 更新等待时间
-        for item in self.queue:
-            item.wait_time += 1
+        self._wait[:n] += 1
+        if n:
+            self._wait_sum += n
+            self._wait_max += 1
 
         if action_indices:
-            for item, idx in zip(self.queue, action_indices):
-                if idx is None or idx >= len(self.dispatch_points):
-                    continue
-                point = self.dispatch_points[idx]
-                nearest = nearest_points_within([point], item.request.lon, item.request.lat, self.config.region_radius_km)
-                if nearest:
-                    # 若区域内有可用MCS则视为即时完成服务
-                    if self._assign_mcs(point):
-                        reward += 1.0 - 0.01 * item.wait_time
-                        item.wait_time = 0
-                    else:
-                        reward -= 0.1  # 区域无可用MCS
+            # None会转为NaN，越界或空动作在掩码中被剔除
+            acts = np.array(action_indices[:n], dtype=np.float64)
+            valid = (acts >= 0) & (acts < len(self.dispatch_points_xy))
+            slots = np.flatnonzero(valid)
+            targets = acts[valid].astype(np.intp)
+            # 动作已指定调度点，只需一次向量化计算请求与所选调度点的成对距离
+            dist = self.dispatch_set.distances_km(self._req_lon[slots], self._req_lat[slots], targets)
+            in_range = dist <= self.config.region_radius_km
+            reward -= 0.2 * int(np.count_nonzero(~in_range))  # 距离过远
+            for slot, target in zip(slots[in_range].tolist(), targets[in_range].tolist()):
+                # 若区域内有可用MCS则视为即时完成服务
+                if self._assign_mcs(self.dispatch_points_xy[target]):
+                    wait = int(self._wait[slot])
+                    reward += 1.0 - 0.01 * wait
+                    self._wait_sum -= wait
+                    self._wait[slot] = 0
                 else:
-                    reward -= 0.2  # 距离过远
+                    reward -= 0.1  # 区域无可用MCS
 
         # 移除已完成的请求
-        self.queue = [item for item in self.queue if item.wait_time > 0]
+        self._compact(self._wait[:n] > 0)
+        if not self._arrived_this_step:
+            self._arrival_ewma *= 1.0 - self._arrival_alpha
+            if self._arrival_ewma < self.ARRIVAL_RATE_EPS:
+                self._arrival_ewma = 0.0
+        self._arrived_this_step = False
         self.time_step += 1
 
         obs = self.observe()
         done = False
         return obs, reward, done, info
 
-    def _assign_mcs(self, target_point: Tuple[float, float]) -> bool:
-        """选择一辆可用MCS前往目标调度点，不考虑电量衰减。"""
+    def _compact(self, keep: np.ndarray) -> None:
+        """按布尔掩码压缩队列，保留的请求移动到数组前部。"""
 
-        for mcs in self.mcs_pool:
-            if mcs.available:
-                mcs.lon, mcs.lat = target_point
-                mcs.available = True
-                return True
-        return False
+        n = self._n
+        k = int(np.count_nonzero(keep))
+        if k == n:
+            return
+        for arr in (self._wait, self._req_lon, self._req_lat, self._requests):
+            arr[:k] = arr[:n][keep]
+        self._requests[k:n] = None
+        self._n = k
+        self._recompute_caches()
+
+    def _recompute_caches(self) -> None:
+        """从数组重新计算增量统计量；队列有请求移除时最大等待需重算。"""
+
+        waits = self._wait[: self._n]
+        self._wait_sum = int(waits.sum())
+        self._wait_max = int(waits.max()) if self._n else 0
+        self._avail_count = int(np.count_nonzero(self.mcs_avail))
+
+    def _assign_mcs(self, target_point: Sequence[float]) -> bool:
+        """选择一辆可用MCS前往目标调度点，扣除单次服务电量并在服务期内标记为忙碌。"""
+
+        idx = int(np.argmax(self.mcs_avail))
+        if not self.mcs_avail[idx]:
+            return False
+        self.mcs_avail[idx] = False
+        self._avail_count -= 1
+        self.mcs_lon[idx], self.mcs_lat[idx] = target_point
+        self.mcs_battery[idx] -= self.config.mcs_energy_per_service_kwh
+        self.mcs_busy_until[idx] = self.time_step + self.config.mcs_service_steps
+        return True
+
+    def _summary_values(self) -> Dict[str, float]:
+        """当前摘要的各字段数值，build_summary与write_summary共用同一来源。"""
+
+        return {
+            "success_rate": 0.0,
+            "average_wait": self._wait_sum / self._n if self._n else 0.0,
+            "arrival_rate": self._arrival_ewma,
+            "available_mcs": self._avail_count,
+            "queue_length": self._n,
+        }
 
     def build_summary(self) -> RegionSummary:
-        success_rate = 0.0
-        average_wait = 0.0
-        if self.queue:
-            waits = [item.wait_time for item in self.queue]
-            average_wait = sum(waits) / len(waits)
-        return RegionSummary(
-            region_id=self.region_id,
-            success_rate=success_rate,
-            average_wait=average_wait,
-            arrival_rate=self.arrivals_last_window / max(1, self.time_step),
-            available_mcs=sum(1 for m in self.mcs_pool if m.available),
-            queue_length=len(self.queue),
-        )
+        """生成上报云端的区域摘要；状态未变化时返回缓存的同一对象，调用方不应修改。"""
+
+        if self._summary_cache_version != self._summary_version:
+            self._summary_cache = RegionSummary(region_id=self.region_id, **self._summary_values())
+            self._summary_cache_version = self._summary_version
+        return self._summary_cache
+
+    def write_summary(self, out_row: np.ndarray) -> None:
+        """按SUMMARY_FIELDS的列顺序将区域摘要直接写入 ``out_row``，不构造RegionSummary。
+
+        摘要行按版本号缓存，状态未变化时只做一次行拷贝。
+        """
+
+        if self._summary_row_version != self._summary_version:
+            values = self._summary_values()
+            self._summary_row[:] = [values[name] for name in SUMMARY_FIELDS]
+            self._summary_row_version = self._summary_version
+        out_row[:] = self._summary_row
 
     def reset_window(self) -> None:
         self.arrivals_last_window = 0
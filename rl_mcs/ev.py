@@ -1,15 +1,20 @@
 """电动车状态机与充电请求生成逻辑。"""
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Iterator, List, Optional
+from typing import Deque, Iterator, Optional, Sequence, Union
 
+import numpy as np
+
+from ._geo_numba import haversine_km_scalar, njit
 from .config import EVConfig
-from .data import TrajectoryPoint, iterate_trips
-from .geo import haversine_km
+from .data import Trajectory, TrajectoryPoint
+
+EV_HISTORY_MAXLEN = 256
 
 
-@dataclass
+@dataclass(slots=True)
 class EVState:
     vehicle_id: str
     soc: float  # 0-1归一化的SOC
@@ -18,13 +23,13 @@ class EVState:
     region_id: Optional[str]
     waiting: bool = False
     queue_start_ts: Optional[str] = None
-    history: List[str] = field(default_factory=list)
+    history: Deque[str] = field(default_factory=lambda: deque(maxlen=EV_HISTORY_MAXLEN))  # 只保留最近的日志
 
     def log(self, message: str) -> None:
         self.history.append(message)
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargeRequest:
     vehicle_id: str
     lon: float
@@ -34,36 +39,73 @@ class ChargeRequest:
     soc: float
 
 
+@njit(cache=True, fastmath=True)
+def _simulate_soc(lon, lat, e_per_km, cap, thresh):
+    """逐段累计能耗更新SOC，返回各点SOC及是否触发充电请求。"""
+
+    n = lon.shape[0]
+    soc_out = np.empty(n, dtype=np.float64)
+    fire = np.zeros(n, dtype=np.bool_)
+    soc = 1.0
+    if n > 0:
+        soc_out[0] = soc
+    for i in range(1, n):
+        distance = haversine_km_scalar(lon[i - 1], lat[i - 1], lon[i], lat[i])
+        soc -= distance * e_per_km / cap
+        if soc < 0.0:
+            soc = 0.0
+        soc_out[i] = soc
+        fire[i] = soc <= thresh
+    return soc_out, fire
+
+
 class EVSimulator:
     """沿轨迹推进车辆位置并产出充电请求。"""
 
     def __init__(self, ev_config: EVConfig):
         self.ev_config = ev_config
 
-    def run_vehicle(self, vehicle_id: str, points: List[TrajectoryPoint], locate_region_fn) -> Iterator[ChargeRequest]:
-        soc = 1.0
-        region_id = locate_region_fn(points[0].lon, points[0].lat)
-        state = EVState(vehicle_id=vehicle_id, soc=soc, lon=points[0].lon, lat=points[0].lat, region_id=region_id)
-        for prev_pt, next_pt in iterate_trips(points):
-            distance = haversine_km(prev_pt.lon, prev_pt.lat, next_pt.lon, next_pt.lat)
-            energy_used = distance * self.ev_config.energy_kwh_per_km
-            soc -= energy_used / self.ev_config.battery_capacity_kwh
-            soc = max(soc, 0.0)
-            state.soc = soc
-            state.lon, state.lat = next_pt.lon, next_pt.lat
-            state.region_id = locate_region_fn(next_pt.lon, next_pt.lat)
-            if soc <= self.ev_config.soc_threshold:
-                yield ChargeRequest(
-                    vehicle_id=vehicle_id,
-                    lon=next_pt.lon,
-                    lat=next_pt.lat,
-                    region_id=state.region_id,
-                    timestamp=next_pt.timestamp,
-                    soc=soc,
-                )
-
-    def stream_requests(self, trajectories, locate_region_fn) -> Iterator[ChargeRequest]:
+    def run_vehicle(
+        self,
+        vehicle_id: str,
+        points: Union[Trajectory, Sequence[TrajectoryPoint]],
+        locate_region_fn,
+        locate_many_fn=None,
+    ) -> Iterator[ChargeRequest]:
+        """沿轨迹产出充电请求。
+
+        Args:
+            locate_region_fn: ``(lon, lat) -> region_id`` 的单点定位函数。
+            locate_many_fn: 可选的批量定位函数 ``(lons, lats) -> region_ids``，提供时所有触发点一次定位。
+        """
+
+        traj = points if isinstance(points, Trajectory) else Trajectory.from_points(vehicle_id, points)
+        lon, lat = traj.lon, traj.lat
+        soc, fire = _simulate_soc(
+            lon,
+            lat,
+            self.ev_config.energy_kwh_per_km,
+            self.ev_config.battery_capacity_kwh,
+            self.ev_config.soc_threshold,
+        )
+        # 仅对触发请求的点做区域定位与对象构造
+        fired = np.flatnonzero(fire)
+        if locate_many_fn is not None:
+            region_ids = locate_many_fn(lon[fired], lat[fired])
+        else:
+            region_ids = [locate_region_fn(float(lon[idx]), float(lat[idx])) for idx in fired]
+        for idx, region_id in zip(fired, region_ids):
+            yield ChargeRequest(
+                vehicle_id=vehicle_id,
+                lon=float(lon[idx]),
+                lat=float(lat[idx]),
+                region_id=region_id,
+                timestamp=traj.timestamps[idx],
+                soc=float(soc[idx]),
+            )
+
+    def stream_requests(self, trajectories, locate_region_fn, locate_many_fn=None) -> Iterator[ChargeRequest]:
         for traj in trajectories:
-            if not traj.points:
+            if len(traj) == 0:
                 continue
-            yield from self.run_vehicle(traj.vehicle_id, traj.points, locate_region_fn)
+            yield from self.run_vehicle(traj.vehicle_id, traj, locate_region_fn, locate_many_fn)
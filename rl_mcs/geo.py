@@ -2,13 +2,24 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Sequence as SequenceABC
 from dataclasses import dataclass
-from math import radians, sin, cos, asin, sqrt
+from functools import cached_property
+from math import radians, degrees, sin, cos, asin, sqrt
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+import shapely
 from shapely.geometry import Point, shape
 
+EARTH_RADIUS_KM = 6371.0
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时回退到标准库json
+    orjson = None
+
 
 @dataclass
 class RegionPolygon:
@@ -29,25 +40,139 @@ def haversine_km(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
     dlat = lat2 - lat1
     a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
     c = 2 * asin(sqrt(a))
-    return 6371 * c
+    return EARTH_RADIUS_KM * c
+
+
+def _cheap_ruler_km(lon1: float, lat1: float, lon2: np.ndarray, lat2: np.ndarray, cos_lat0: float) -> np.ndarray:
+    """等距圆柱近似距离（公里），经度差按cos_lat0缩放，适合几十公里内的预筛选。"""
+
+    # 经度差折回[-180, 180)，跨越±180°经线的两点不会被当作相距一周
+    dx = np.radians((lon2 - lon1 + 180.0) % 360.0 - 180.0) * cos_lat0
+    dy = np.radians(lat2 - lat1)
+    return EARTH_RADIUS_KM * np.sqrt(dx * dx + dy * dy)
+
+
+def _projection_slack(cos_lat0: float, max_abs_lat_rad: float) -> float:
+    """近似距离相对真实距离可能偏大的最大比例（含1%余量），用于放大预筛选半径。"""
+
+    return cos_lat0 / max(cos(max_abs_lat_rad), 1e-12) * 1.01
+
+
+def haversine_km_np(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """haversine_km的NumPy向量化版本，参数按广播规则逐元素计算（公里）。"""
+
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lon1, lat1, lon2, lat2))
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class RegionIndex(SequenceABC):
+    """Voronoi区域集合及其数组化与STRtree索引，可按List[RegionPolygon]的只读方式使用。"""
+
+    LOCATE_LOOP_MAX_REGIONS = 64  # 区域数不超过该值时单点定位逐个判断并在首次命中时返回
+
+    def __init__(self, regions: Iterable[RegionPolygon]):
+        self.regions: List[RegionPolygon] = list(regions)
+        self._poly_array = np.empty(len(self.regions), dtype=object)
+        self._poly_array[:] = [r.polygon for r in self.regions]
+        self._ids = np.array([r.region_id for r in self.regions], dtype=object)
+        self._tree = shapely.STRtree(self._poly_array)
+
+    def __len__(self) -> int:
+        return len(self.regions)
 
+    def __getitem__(self, idx):
+        return self.regions[idx]
 
-def load_voronoi_regions(path: Path) -> List[RegionPolygon]:
-    """从GeoJSON文件加载Voronoi多边形。"""
+    def __iter__(self) -> Iterator[RegionPolygon]:
+        return iter(self.regions)
 
+    @property
+    def tree(self) -> shapely.STRtree:
+        """按区域顺序构建的STRtree，查询结果即区域下标。"""
+
+        return self._tree
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids
+
+    @property
+    def polygons(self) -> np.ndarray:
+        return self._poly_array
+
+    def locate(self, lon: float, lat: float) -> Optional[str]:
+        """返回包含指定点的区域ID；区域较多时先用STRtree按外包框筛选，再对少量候选做精确包含判断。"""
+
+        if len(self.regions) <= self.LOCATE_LOOP_MAX_REGIONS:
+            # 区域较少时STRtree查询的固定开销高于逐个contains，首个命中即返回
+            point = Point(lon, lat)
+            for region in self.regions:
+                if region.polygon.contains(point):
+                    return region.region_id
+            return None
+        # predicate="within" 即 point.within(polygon)，与polygon.contains(point)等价
+        hits = self._tree.query(shapely.points(lon, lat), predicate="within")
+        return self._ids[hits.min()] if hits.size else None
+
+    def locate_many(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """批量定位，返回与输入对齐的区域ID数组（未命中为None）。
+
+        一次STRtree查询得到(点, 多边形)配对；同一点命中多个区域时取索引最小者，与locate一致。
+        """
+
+        points = shapely.points(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        out = np.full(len(points), None, dtype=object)
+        point_idx, poly_idx = self._tree.query(points, predicate="within")
+        if point_idx.size:
+            order = np.lexsort((poly_idx, point_idx))
+            point_idx, poly_idx = point_idx[order], poly_idx[order]
+            first = np.ones(point_idx.size, dtype=np.bool_)
+            first[1:] = point_idx[1:] != point_idx[:-1]
+            out[point_idx[first]] = self._ids[poly_idx[first]]
+        return out
+
+
+# 进程内共享的区域索引缓存：解析后的路径 -> (文件修改时间, RegionIndex)
+_REGION_CACHE: Dict[Path, Tuple[int, RegionIndex]] = {}
+
+
+def load_voronoi_regions(path: Path) -> RegionIndex:
+    """从GeoJSON文件加载Voronoi多边形。
+
+    同一路径在进程内只构建一次RegionIndex（含STRtree、ID数组与多边形数组），重复调用共享同一对象；
+    文件修改时间变化后会重新加载。
+    """
+
+    resolved = Path(path).resolve()
+    mtime_ns = resolved.stat().st_mtime_ns
+    cached = _REGION_CACHE.get(resolved)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    index = _build_region_index(resolved)
+    _REGION_CACHE[resolved] = (mtime_ns, index)
+    return index
+
+
+def _build_region_index(path: Path) -> RegionIndex:
     regions: List[RegionPolygon] = []
-    with path.open("r", encoding="utf-8") as f:
-        geojson = json.load(f)
+    raw = path.read_bytes()
+    geojson = orjson.loads(raw) if orjson is not None else json.loads(raw)
     for feature in geojson["features"]:
-        region_id = str(feature["properties"].get("id", feature["properties"].get("region")))
+        properties = feature["properties"]
+        region_id = str(properties.get("region_id", properties.get("id", properties.get("region"))))
         polygon = shape(feature["geometry"])
         regions.append(RegionPolygon(region_id=region_id, polygon=polygon))
-    return regions
+    return RegionIndex(regions)
 
 
-def locate_region(regions: List[RegionPolygon], lon: float, lat: float) -> Optional[str]:
+def locate_region(regions: Union[RegionIndex, List[RegionPolygon]], lon: float, lat: float) -> Optional[str]:
     """返回包含指定点的区域ID，若无则为None。"""
 
+    if isinstance(regions, RegionIndex):
+        return regions.locate(lon, lat)
     point = Point(lon, lat)
     for region in regions:
         if region.polygon.contains(point):
@@ -55,13 +180,76 @@ def locate_region(regions: List[RegionPolygon], lon: float, lat: float) -> Optio
     return None
 
 
-def nearest_points_within(points: List[Tuple[float, float]], lon: float, lat: float, radius_km: float) -> List[Tuple[int, float]]:
-    """返回半径范围内候选点的索引与距离。"""
-
-    candidates: List[Tuple[int, float]] = []
-    for idx, (lon2, lat2) in enumerate(points):
-        dist = haversine_km(lon, lat, lon2, lat2)
-        if dist <= radius_km:
-            candidates.append((idx, dist))
-    candidates.sort(key=lambda x: x[1])
-    return candidates
+@dataclass(frozen=True, eq=False)
+class PointSet:
+    """候选点的数组化表示，预先换算弧度与cos(lat)供向量化距离计算复用。"""
+
+    xy: np.ndarray  # (P, 2) 经纬度
+    lon_rad: np.ndarray
+    lat_rad: np.ndarray
+    cos_lat: np.ndarray
+
+    @classmethod
+    def from_points(cls, points: Union[Sequence[Tuple[float, float]], np.ndarray]) -> "PointSet":
+        xy = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lat_rad = np.radians(xy[:, 1])
+        return cls(xy=xy, lon_rad=np.radians(xy[:, 0]), lat_rad=lat_rad, cos_lat=np.cos(lat_rad))
+
+    def __len__(self) -> int:
+        return len(self.xy)
+
+    def subset(self, mask: np.ndarray) -> "PointSet":
+        """按掩码或索引取子集，复用已换算的数组。"""
+
+        xy = self.xy[mask]
+        xy.flags.writeable = False
+        return PointSet(xy=xy, lon_rad=self.lon_rad[mask], lat_rad=self.lat_rad[mask], cos_lat=self.cos_lat[mask])
+
+    def distances_km(self, lon, lat, idx: Optional[np.ndarray] = None) -> np.ndarray:
+        """查询点到idx所指各点的大圆距离（公里）。
+
+        ``lon``/``lat`` 为角度，可为标量或与idx等长的数组（逐对计算）；点侧只需计算半角正弦。
+        """
+
+        if idx is None:
+            idx = np.arange(len(self))
+        plon, plat, pcos = self.lon_rad[idx], self.lat_rad[idx], self.cos_lat[idx]
+        lon_r, lat_r = np.radians(lon), np.radians(lat)
+        if np.ndim(lon_r) == 0:
+            # numba内核延迟导入，只用到地理工具的模块（如data）不必承担numba的导入开销
+            from ._geo_numba import HAS_NUMBA, haversine_km_batch
+
+            if HAS_NUMBA:
+                return haversine_km_batch(float(lon_r), float(lat_r), plon, plat, pcos, np.empty(len(plon)))
+        a = np.sin((plat - lat_r) / 2) ** 2 + np.cos(lat_r) * pcos * np.sin((plon - lon_r) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    @cached_property
+    def max_abs_lat_rad(self) -> float:
+        return float(np.abs(self.lat_rad).max()) if len(self) else 0.0
+
+
+def nearest_points_within(
+    points: Union[PointSet, Sequence[Tuple[float, float]], np.ndarray], lon: float, lat: float, radius_km: float
+) -> List[Tuple[int, float]]:
+    """返回半径范围内候选点的索引与距离，按距离升序。
+
+    传入PointSet可复用预先换算的弧度数组。先用外包框与等距圆柱近似距离预筛选，候选点最后以Haversine精确判定。
+    """
+
+    pts = points if isinstance(points, PointSet) else PointSet.from_points(points)
+    lat_r = radians(lat)
+    cos_lat_q = cos(lat_r)
+    radius_bound = radius_km * _projection_slack(cos_lat_q, max(pts.max_abs_lat_rad, abs(lat_r)))
+    # 外包框粗筛只做减法与比较，明显超出半径的点不再参与后续计算；经度差同样折回[-180, 180)
+    r_deg = degrees(radius_bound / EARTH_RADIUS_KM)
+    dlon = np.abs((pts.xy[:, 0] - lon + 180.0) % 360.0 - 180.0)
+    box = (np.abs(pts.xy[:, 1] - lat) <= r_deg) & (dlon * cos_lat_q <= r_deg)
+    idx = np.flatnonzero(box)
+    approx = _cheap_ruler_km(lon, lat, pts.xy[idx, 0], pts.xy[idx, 1], cos_lat_q)
+    idx = idx[approx <= radius_bound]
+    dist = pts.distances_km(lon, lat, idx)
+    mask = dist <= radius_km
+    idx, dist = idx[mask], dist[mask]
+    order = np.argsort(dist, kind="stable")
+    return list(zip(idx[order].tolist(), dist[order].tolist()))
@@ -2,29 +2,38 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Tuple
+from typing import Tuple, Union
+
+import numpy as np
 
 from .agents import EdgePolicy
 from .config import SimulationConfig, TrainingSchedule
-from .data import load_dispatch_points, load_vehicle_trajectories
+from .data import iter_vehicle_trajectories, load_dispatch_points
 from .edge_env import EdgeEnv
 from .ev import EVSimulator
-from .geo import load_voronoi_regions, locate_region
+from .geo import PointSet, load_voronoi_regions, locate_region
 from .trainer import Trainer
 
 logger = logging.getLogger(__name__)
 
 
-def build_region_dispatch_points(dispatch_rows, region_id: str) -> List[Tuple[float, float]]:
-    return [
-        (row["lon"], row["lat"])
-        for row in dispatch_rows
-        if not row.get("region") or row.get("region") == region_id
-    ]
+def build_region_dispatch_points(
+    dispatch_points: Tuple[Union[PointSet, np.ndarray], np.ndarray], region_id: str
+) -> PointSet:
+    """筛选区域可用的调度点，附带预计算的弧度与cos(lat)；若全部可用则直接共享原PointSet而不复制。"""
+
+    points, regions = dispatch_points
+    if not isinstance(points, PointSet):
+        points = PointSet.from_points(points)
+    mask = (regions == "") | (regions == region_id)
+    if mask.all():
+        return points
+    return points.subset(mask)
 
 
 def build_trainer(sim_config: SimulationConfig, schedule: TrainingSchedule) -> Trainer:
-    dispatch_rows = load_dispatch_points(sim_config.edge.dispatch_points_path)
+    dispatch_xy, dispatch_regions = load_dispatch_points(sim_config.edge.dispatch_points_path)
+    dispatch_points = (PointSet.from_points(dispatch_xy), dispatch_regions)
     regions = load_voronoi_regions(sim_config.edge.fcs_regions_path)
     region_ids = sim_config.region_ids or [r.region_id for r in regions]
     trainer = Trainer(sim_config, schedule)
@@ -32,10 +41,17 @@ def build_trainer(sim_config: SimulationConfig, schedule: TrainingSchedule) -> T
     def locate(lon: float, lat: float):
         return locate_region(regions, lon, lat)
 
+    # 默认每个区域独立的边缘策略；开启参数共享时所有区域使用同一策略，每步只需一次批量推理
+    shared_policy = EdgePolicy(config=sim_config.edge) if sim_config.share_edge_policy else None
     for region_id in region_ids:
-        points = build_region_dispatch_points(dispatch_rows, region_id)
-        env = EdgeEnv(region_id=region_id, config=sim_config.edge, dispatch_points=points)
-        policy = EdgePolicy(config=sim_config.edge)
+        points = build_region_dispatch_points(dispatch_points, region_id)
+        env = EdgeEnv(
+            region_id=region_id,
+            config=sim_config.edge,
+            dispatch_points=points,
+            allocation_interval=sim_config.cloud.allocation_interval,
+        )
+        policy = shared_policy if shared_policy is not None else EdgePolicy(config=sim_config.edge)
         trainer.register_region(region_id, env, policy)
 
     return trainer
@@ -48,7 +64,7 @@ def main() -> None:
     trainer = build_trainer(sim_config, schedule)
 
     logger.info("Loading trajectories from %s", sim_config.trajectory_root)
-    trajectories = load_vehicle_trajectories(sim_config.trajectory_root, sim_config.region_ids)
+    trajectories = iter_vehicle_trajectories(sim_config.trajectory_root, sim_config.region_ids)
     ev_sim = EVSimulator(sim_config.ev)
     regions = load_voronoi_regions(sim_config.edge.fcs_regions_path)
 
@@ -56,12 +72,15 @@ def main() -> None:
         return locate_region(regions, lon, lat)
 
     # 在训练前将历史请求流入各区域环境
-    for request in ev_sim.stream_requests(trajectories, locate):
+    for request in ev_sim.stream_requests(trajectories, locate, locate_many_fn=regions.locate_many):
         region_env = trainer.edge_envs.get(request.region_id)
         if region_env:
             region_env.add_request(request)
 
-    trainer.train()
+    try:
+        trainer.train()
+    finally:
+        trainer.close()
 
 
 if __name__ == "__main__":
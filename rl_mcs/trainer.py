@@ -2,27 +2,119 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
-from dataclasses import dataclass, field
-from typing import Dict, Iterable, List
+from collections import defaultdict, namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 from .agents import CloudPolicy, EdgePolicy
-from .cloud_env import CloudEnv
+from .cloud_env import SUMMARY_FIELDS, CloudEnv
 from .config import SimulationConfig, TrainingSchedule
-from .edge_env import EdgeEnv
+from .edge_env import EdgeEnv, EdgeObservation
+from .vec_env import VectorEdgeEnv
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class RolloutBuffer:
-    trajectories: List[dict] = field(default_factory=list)
+# 单步采样记录；字段顺序与对应的BufferSpec一致，可按位置直接写入RolloutBuffer
+Transition = namedtuple("Transition", "obs actions reward new_obs done info")
+CloudTransition = namedtuple("CloudTransition", "obs action reward new_obs done info")
+
+# 字段名 -> (单条记录的形状, dtype)
+BufferSpec = Dict[str, Tuple[Tuple[int, ...], object]]
 
-    def add(self, **kwargs) -> None:
-        self.trajectories.append(kwargs)
+EDGE_BUFFER_SPEC: BufferSpec = {
+    "obs": ((), object),
+    "actions": ((), object),
+    "reward": ((), np.float64),
+    "new_obs": ((), object),
+    "done": ((), np.bool_),
+    "info": ((), object),
+}
+
+CLOUD_BUFFER_SPEC: BufferSpec = {
+    "obs": ((), object),
+    "action": ((), object),
+    "reward": ((), np.float64),
+    "new_obs": ((), object),
+    "done": ((), np.bool_),
+    "info": ((), object),
+}
+
+
+class RolloutBuffer:
+    """列式（SoA）采样缓冲区，每个字段一块预分配数组，按写指针追加，容量不足时倍增。
+
+    只有数值字段（如reward、done）是连续的数值数组；obs、actions、new_obs、info为object列，
+    其中保存的是对象引用，as_batch()不会将其展开为数值张量。
+    """
+
+    def __init__(self, spec: BufferSpec, capacity: int = 1024):
+        self.spec = dict(spec)
+        self.capacity = max(1, capacity)
+        self._n = 0
+        self._buf: Dict[str, np.ndarray] = {
+            name: np.empty((self.capacity,) + tuple(shape), dtype=dtype) for name, (shape, dtype) in self.spec.items()
+        }
+        self._columns: List[np.ndarray] = list(self._buf.values())  # 按spec顺序，供按位置写入
+        self._fields: Tuple[str, ...] = tuple(self.spec)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def add(self, record: Optional[tuple] = None, /, **kwargs) -> None:
+        """追加一条记录：``record`` 为字段顺序与spec一致的元组（如Transition），否则按关键字写入。"""
+
+        if self._n == self.capacity:
+            self._grow()
+        if record is not None:
+            # 按位置写入前校验字段名（namedtuple）与长度，避免错位或截断
+            fields = getattr(record, "_fields", None)
+            if fields is not None and fields != self._fields:
+                raise ValueError(f"Record fields {fields} do not match buffer fields {self._fields}")
+            if len(record) != len(self._columns):
+                raise ValueError(f"Expected {len(self._columns)} values, got {len(record)}")
+            for arr, value in zip(self._columns, record):
+                arr[self._n] = value
+        else:
+            if kwargs.keys() != self.spec.keys():
+                raise ValueError(f"Record fields {sorted(kwargs)} do not match buffer fields {sorted(self.spec)}")
+            for name, value in kwargs.items():
+                self._buf[name][self._n] = value
+        self._n += 1
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        for name, arr in self._buf.items():
+            grown = np.empty((self.capacity,) + arr.shape[1:], dtype=arr.dtype)
+            grown[: self._n] = arr[: self._n]
+            self._buf[name] = grown
+        self._columns = list(self._buf.values())
+
+    def as_batch(self) -> Dict[str, np.ndarray]:
+        """返回各字段已写入部分的连续视图，不做拷贝。"""
+
+        return {name: arr[: self._n] for name, arr in self._buf.items()}
+
+    @property
+    def trajectories(self) -> List[dict]:
+        """按条构造的字典列表，兼容旧的逐条接口。"""
+
+        return [{name: arr[idx] for name, arr in self._buf.items()} for idx in range(self._n)]
 
     def clear(self) -> None:
-        self.trajectories.clear()
+        for arr in self._buf.values():
+            if arr.dtype == object:
+                arr[: self._n] = None  # 释放对观测等对象的引用
+        self._n = 0
+
+
+def concat_batches(batches: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """按字段拼接多个as_batch()结果；只有一个批次时直接返回，不做拷贝。"""
+
+    if len(batches) == 1:
+        return batches[0]
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
 
 
 class Trainer:
@@ -33,14 +125,31 @@ class Trainer:
         self.schedule = schedule
         self.edge_policies: Dict[str, EdgePolicy] = {}
         self.edge_envs: Dict[str, EdgeEnv] = {}
+        self.edge_vec_env = VectorEdgeEnv(max_workers=sim_config.edge_rollout_workers)
+        # 共享同一策略对象的区域分为一组（按VectorEdgeEnv中的顺序索引），每组每步只调用一次act_batch
+        self._edge_policy_groups: Dict[int, Tuple[EdgePolicy, List[int]]] = {}
         self.cloud_policy = CloudPolicy(config=sim_config.cloud)
         self.cloud_env = CloudEnv(config=sim_config.cloud, region_ids=list(sim_config.region_ids or []))
-        self.edge_buffers: Dict[str, RolloutBuffer] = defaultdict(RolloutBuffer)
-        self.cloud_buffer = RolloutBuffer()
+        # 第0步到首次同步（含）共写入edge_sync_every + 1条，之后每个周期写入edge_sync_every条
+        self.edge_buffers: Dict[str, RolloutBuffer] = defaultdict(
+            lambda: RolloutBuffer(EDGE_BUFFER_SPEC, capacity=schedule.edge_sync_every + 1)
+        )
+        # 云端采样复用的摘要数组，行与edge_vec_env中的区域顺序一致
+        self._summary_buf = np.zeros((0, len(SUMMARY_FIELDS)), dtype=np.float64)
+        self._summary_region_ids: List[str] = []
+        self.cloud_buffer = RolloutBuffer(
+            CLOUD_BUFFER_SPEC, capacity=schedule.cloud_update_every // sim_config.cloud.allocation_interval + 1
+        )
 
     def register_region(self, region_id: str, env: EdgeEnv, policy: EdgePolicy) -> None:
+        if region_id in self.edge_envs:
+            raise ValueError(f"Region {region_id} is already registered")
         self.edge_envs[region_id] = env
         self.edge_policies[region_id] = policy
+        self._edge_policy_groups.setdefault(id(policy), (policy, []))[1].append(len(self.edge_vec_env))
+        self.edge_vec_env.add_env(env)
+        self._summary_buf = np.zeros((len(self.edge_vec_env), len(SUMMARY_FIELDS)), dtype=np.float64)
+        self._summary_region_ids = self.edge_vec_env.region_ids
 
     def edge_rollout(self, region_id: str) -> None:
         env = self.edge_envs[region_id]
@@ -48,20 +157,39 @@ class Trainer:
         obs = env.observe()
         actions = policy.act(obs)
         new_obs, reward, done, info = env.step(actions)
-        self.edge_buffers[region_id].add(obs=obs, actions=actions, reward=reward, new_obs=new_obs, done=done, info=info)
+        self.edge_buffers[region_id].add(Transition(obs, actions, reward, new_obs, done, info))
+
+    def edge_rollout_batch(self) -> None:
+        """通过VectorEdgeEnv一次推进全部区域。"""
+
+        region_ids = self.edge_vec_env.region_ids
+        obs_batch = self.edge_vec_env.observe_batch()
+        actions = self._edge_act_batch(obs_batch)
+        new_obs, rewards, dones, infos = self.edge_vec_env.step(actions)
+        for idx, region_id in enumerate(region_ids):
+            self.edge_buffers[region_id].add(
+                Transition(obs_batch[idx], actions[idx], float(rewards[idx]), new_obs[idx], bool(dones[idx]), infos[idx])
+            )
+
+    def _edge_act_batch(self, obs_batch: List[EdgeObservation]) -> List[List[int]]:
+        actions: List[List[int]] = [[] for _ in obs_batch]
+        for policy, indices in self._edge_policy_groups.values():
+            group_actions = policy.act_batch([obs_batch[idx] for idx in indices])
+            for idx, action in zip(indices, group_actions):
+                actions[idx] = action
+        return actions
 
     def cloud_rollout(self) -> None:
-        summaries = [env.build_summary() for env in self.edge_envs.values()]
-        cloud_obs = self.cloud_env.observe(summaries)
+        summaries = self.edge_vec_env.write_summaries(self._summary_buf)
+        cloud_obs = self.cloud_env.observe(summaries, self._summary_region_ids)
         action = self.cloud_policy.act(cloud_obs)
-        new_obs, reward, done, info = self.cloud_env.step(action, summaries)
-        self.cloud_buffer.add(obs=cloud_obs, action=action, reward=reward, new_obs=new_obs, done=done, info=info)
+        new_obs, reward, done, info = self.cloud_env.step(action, cloud_obs)
+        self.cloud_buffer.add(CloudTransition(cloud_obs, action, reward, new_obs, done, info))
 
     def train(self) -> None:
         logger.info("Starting training for %d iterations", self.schedule.max_iterations)
         for step in range(self.schedule.max_iterations):
-            for region_id in self.edge_envs:
-                self.edge_rollout(region_id)
+            self.edge_rollout_batch()
             if step % self.sim_config.cloud.allocation_interval == 0:
                 self.cloud_rollout()
 
@@ -75,13 +203,21 @@ class Trainer:
             if step % self.schedule.save_interval == 0 and step > 0:
                 logger.info("Saving checkpoint at step %d", step)
 
+    def close(self) -> None:
+        self.edge_vec_env.close()
+
     def _update_edges(self) -> None:
-        for region_id, buffer in self.edge_buffers.items():
-            metrics = self.edge_policies[region_id].update(buffer.trajectories)
-            logger.debug("Edge policy update %s: %s", region_id, metrics)
-            buffer.clear()
+        # 共享策略的区域合并为一个批次，每个策略每次同步只更新一次
+        region_ids = self.edge_vec_env.region_ids
+        for policy, indices in self._edge_policy_groups.values():
+            group_ids = [region_ids[idx] for idx in indices]
+            buffers = [self.edge_buffers[region_id] for region_id in group_ids]
+            metrics = policy.update(concat_batches([buffer.as_batch() for buffer in buffers]))
+            logger.debug("Edge policy update %s: %s", group_ids, metrics)
+            for buffer in buffers:
+                buffer.clear()
 
     def _update_cloud(self) -> None:
-        metrics = self.cloud_policy.update(self.cloud_buffer.trajectories)
+        metrics = self.cloud_policy.update(self.cloud_buffer.as_batch())
         logger.debug("Cloud policy update: %s", metrics)
         self.cloud_buffer.clear()
@@ -0,0 +1,74 @@
+"""多区域EdgeEnv的批量封装，一次调用推进全部区域。"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import RegionSummary
+from .edge_env import EdgeEnv, EdgeObservation
+
+
+class VectorEdgeEnv:
+    """持有N个区域环境，批量观测与推进并返回堆叠后的奖励/终止标志。
+
+    ``max_workers > 1`` 时各区域的step在线程池中并行执行；区域之间没有共享的可变状态，
+    NumPy运算期间会释放GIL。
+    """
+
+    def __init__(self, envs: Sequence[EdgeEnv] = (), max_workers: int = 1):
+        self.envs: List[EdgeEnv] = list(envs)
+        self._pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="edge-env") if max_workers > 1 else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.envs)
+
+    @property
+    def region_ids(self) -> List[str]:
+        return [env.region_id for env in self.envs]
+
+    def add_env(self, env: EdgeEnv) -> None:
+        self.envs.append(env)
+
+    def observe_batch(self) -> List[EdgeObservation]:
+        return [env.observe() for env in self.envs]
+
+    def step(
+        self, actions: Sequence[Optional[List[int]]]
+    ) -> Tuple[List[EdgeObservation], np.ndarray, np.ndarray, List[Dict]]:
+        """按区域顺序执行动作，返回观测列表、奖励向量、终止向量与信息列表。"""
+
+        if len(actions) != len(self.envs):
+            raise ValueError(f"Expected {len(self.envs)} action lists, got {len(actions)}")
+        if self._pool is not None:
+            results = list(self._pool.map(lambda env, action: env.step(action), self.envs, actions))
+        else:
+            results = [env.step(action) for env, action in zip(self.envs, actions)]
+        obs_batch: List[EdgeObservation] = []
+        rewards = np.empty(len(self.envs), dtype=np.float64)
+        dones = np.empty(len(self.envs), dtype=np.bool_)
+        infos: List[Dict] = []
+        for idx, (obs, reward, done, info) in enumerate(results):
+            obs_batch.append(obs)
+            rewards[idx] = reward
+            dones[idx] = done
+            infos.append(info)
+        return obs_batch, rewards, dones, infos
+
+    def build_summaries(self) -> List[RegionSummary]:
+        return [env.build_summary() for env in self.envs]
+
+    def write_summaries(self, out: np.ndarray) -> np.ndarray:
+        """将各区域摘要逐行写入形状为(len(envs), len(SUMMARY_FIELDS))的 ``out``。"""
+
+        for row, env in zip(out, self.envs):
+            env.write_summary(row)
+        return out
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
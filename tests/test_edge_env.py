@@ -0,0 +1,134 @@
+"""EdgeEnv列式实现与逐项列表实现的等价性测试。"""
+from __future__ import annotations
+
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from rl_mcs.cloud_env import SUMMARY_FIELDS, stack_summaries
+from rl_mcs.config import CloudConfig, EdgeConfig
+from rl_mcs.edge_env import EdgeEnv
+from rl_mcs.ev import ChargeRequest
+from rl_mcs.geo import haversine_km
+
+
+class ListEdgeEnv:
+    """以Python列表逐项保存排队请求与MCS状态的参照实现。"""
+
+    def __init__(self, config: EdgeConfig, dispatch_points: List[Tuple[float, float]]):
+        self.config = config
+        self.dispatch_points = dispatch_points
+        self.queue: List[list] = []  # [request, wait_time]
+        self.time_step = 0
+        self.arrivals_last_window = 0
+        self.alpha = 1.0 / CloudConfig.allocation_interval
+        self.arrival_rate = 0.0
+        self.arrived = False
+        self.mcs_avail = [True] * len(dispatch_points)
+        self.mcs_battery = [config.mcs_battery_kwh] * len(dispatch_points)
+        self.mcs_busy_until = [0] * len(dispatch_points)
+
+    def add_request(self, request: ChargeRequest) -> None:
+        if len(self.queue) >= self.config.max_queue_size:
+            return
+        self.queue.append([request, 0])
+        self.arrivals_last_window += 1
+        self.arrival_rate = (1.0 - self.alpha) * self.arrival_rate + self.alpha
+        self.arrived = True
+
+    def _assign_mcs(self) -> bool:
+        for i, avail in enumerate(self.mcs_avail):
+            if avail:
+                self.mcs_avail[i] = False
+                self.mcs_battery[i] -= self.config.mcs_energy_per_service_kwh
+                self.mcs_busy_until[i] = self.time_step + self.config.mcs_service_steps
+                return True
+        return False
+
+    def step(self, action_indices: Optional[List[Optional[int]]]) -> float:
+        reward = 0.0
+        for i in range(len(self.mcs_avail)):
+            if self.mcs_battery[i] > self.config.mcs_min_battery_kwh and self.mcs_busy_until[i] <= self.time_step:
+                self.mcs_avail[i] = True
+        for item in self.queue:
+            item[1] += 1
+        if action_indices:
+            for item, idx in zip(self.queue, action_indices):
+                if idx is None or idx >= len(self.dispatch_points):
+                    continue
+                lon, lat = self.dispatch_points[idx]
+                if haversine_km(item[0].lon, item[0].lat, lon, lat) <= self.config.region_radius_km:
+                    if self._assign_mcs():
+                        reward += 1.0 - 0.01 * item[1]
+                        item[1] = 0
+                    else:
+                        reward -= 0.1
+                else:
+                    reward -= 0.2
+        self.queue = [item for item in self.queue if item[1] > 0]
+        if not self.arrived:
+            self.arrival_rate *= 1.0 - self.alpha
+            if self.arrival_rate < EdgeEnv.ARRIVAL_RATE_EPS:
+                self.arrival_rate = 0.0
+        self.arrived = False
+        self.time_step += 1
+        return reward
+
+    @property
+    def waits(self) -> List[int]:
+        return [wait for _, wait in self.queue]
+
+
+def _assert_matches(env: EdgeEnv, ref: ListEdgeEnv) -> None:
+    waits = ref.waits
+    obs = env.observe()
+    assert obs.pending_requests == len(waits)
+    assert obs.mean_wait == pytest.approx(sum(waits) / len(waits) if waits else 0.0)
+    assert obs.max_wait == (max(waits) if waits else 0)
+    assert obs.available_mcs == sum(ref.mcs_avail)
+    assert obs.time_bin == (ref.time_step // 12) % 24
+    assert obs.arrival_rate == pytest.approx(ref.arrival_rate)
+    assert [item.wait_time for item in env.queue] == waits
+    assert [item.request for item in env.queue] == [req for req, _ in ref.queue]
+
+    summary = env.build_summary()
+    assert summary.average_wait == pytest.approx(sum(waits) / len(waits) if waits else 0.0)
+    assert summary.arrival_rate == pytest.approx(ref.arrival_rate)
+    assert summary.available_mcs == sum(ref.mcs_avail)
+    assert summary.queue_length == len(waits)
+
+    row = np.empty(len(SUMMARY_FIELDS))
+    env.write_summary(row)
+    assert row.tolist() == pytest.approx(stack_summaries([summary])[0].tolist())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_steps_match_list_reference(seed: int) -> None:
+    rng = random.Random(seed)
+    config = EdgeConfig(max_queue_size=8)
+    points = [(104.0 + rng.random() * 0.05, 30.6 + rng.random() * 0.05) for _ in range(4)]
+    env = EdgeEnv(region_id="R1", config=config, dispatch_points=points)
+    ref = ListEdgeEnv(config, points)
+
+    for step in range(300):
+        for k in range(rng.choice([0, 0, 1, 2, 4])):
+            request = ChargeRequest(
+                vehicle_id=f"v{step}-{k}",
+                lon=104.0 + rng.random() * 0.05,
+                lat=30.6 + rng.random() * 0.05,
+                region_id="R1",
+                timestamp=str(step),
+                soc=0.1,
+            )
+            env.add_request(request)
+            ref.add_request(request)
+        n_actions = max(0, len(ref.queue) + rng.choice([-1, 0, 0, 1]))
+        actions = [rng.choice([None, len(points), *range(len(points))]) for _ in range(n_actions)]
+        if rng.random() < 0.1:
+            actions = None
+
+        _, reward, _, _ = env.step(list(actions) if actions is not None else None)
+        assert reward == pytest.approx(ref.step(actions))
+        _assert_matches(env, ref)